@@ -1,14 +1,55 @@
 # ------------ Imports and Variables ------------
 
 import re
-from collections import defaultdict
 from typing import List, Tuple, Dict, Set, Optional
 
 DIRECTIONS : List[str] = ['N', 'E', 'S', 'W']  # Clockwise directions
+HEADINGS : Dict[str, int] = {direction: heading for heading, direction in enumerate(DIRECTIONS)}  # Direction to clockwise index
+DX : Tuple[int, ...] = (0, 1, 0, -1)  # x step per heading (N, E, S, W)
+DY : Tuple[int, ...] = (1, 0, -1, 0)  # y step per heading (N, E, S, W)
+COORDINATE_PATTERN : re.Pattern = re.compile(r"[0-9]+")  # ASCII digits only, so int() always accepts a match
+VALID_COMMANDS_TABLE : Dict[int, None] = str.maketrans('', '', 'LRF')  # Deletes valid commands, leaving only invalid characters
 
 
 # --------------- Helper Functions ---------------
 
+def _turn(heading: int, quarter_turns: int) -> int:
+
+    """
+    Turns a heading by a number of quarter turns, wrapping around the four clockwise directions.
+
+    Args:
+        heading (int): The current heading as a clockwise index into DIRECTIONS.
+        quarter_turns (int): -1 to turn left, +1 to turn right.
+
+    Returns:
+        int: The new heading.
+    """
+
+    return (heading + quarter_turns) & 3
+
+def _step(x: int, y: int, heading: int, width: int, height: int) -> Tuple[int, int]:
+
+    """
+    Steps one grid point along a heading, if the new position is within the (inclusive) grid bounds.
+
+    Args:
+        x (int): The current x-coordinate.
+        y (int): The current y-coordinate.
+        heading (int): The heading as a clockwise index into DIRECTIONS.
+        width (int): The width of the simulation grid.
+        height (int): The height of the simulation grid.
+
+    Returns:
+        Tuple[int, int]: The new (x, y) coordinates, or the current ones if the step is out of bounds.
+    """
+
+    new_x, new_y = x + DX[heading], y + DY[heading]
+
+    if 0 <= new_x <= width and 0 <= new_y <= height:
+        return new_x, new_y
+    return x, y  # No movement if out of bounds
+
 def rotate_left(direction: str) -> str:
 
     """
@@ -21,21 +62,21 @@ def rotate_left(direction: str) -> str:
         str: The new direction after turning left.
     """
 
-    return DIRECTIONS[(DIRECTIONS.index(direction) - 1) % 4]
+    return DIRECTIONS[_turn(HEADINGS[direction], -1)]
 
 def rotate_right(direction: str) -> str:
     
     """
-    Rotates the car's given direction 90 degrees to the left.
+    Rotates the car's given direction 90 degrees to the right.
 
     Args:
         direction (str): The current direction ('N', 'E', 'S', or 'W').
 
     Returns:
-        str: The new direction after turning left.
+        str: The new direction after turning right.
     """
 
-    return DIRECTIONS[(DIRECTIONS.index(direction) + 1) % 4]
+    return DIRECTIONS[_turn(HEADINGS[direction], 1)]
 
 def move_forward(x: int, y: int, direction: str, width: int, height: int) -> Tuple[int, int]:
 
@@ -54,15 +95,7 @@ def move_forward(x: int, y: int, direction: str, width: int, height: int) -> Tup
         Tuple[int, int]: The new (x, y) coordinates after moving.
     """
 
-    if direction == 'N' and y + 1 <= height:
-        return x, y + 1
-    elif direction == 'S' and y - 1 >= 0:
-        return x, y - 1
-    elif direction == 'E' and x + 1 <= width:
-        return x + 1, y
-    elif direction == 'W' and x - 1 >= 0:
-        return x - 1, y
-    return x, y  # No movement if out of bounds
+    return _step(x, y, HEADINGS[direction], width, height)
 
 def is_valid_coordinates(x: str, y: str, sim: Optional['Simulation'] = None) -> bool:
 
@@ -80,8 +113,15 @@ def is_valid_coordinates(x: str, y: str, sim: Optional['Simulation'] = None) ->
         bool: True if the coordinates are valid, False otherwise.
     """
 
-    positive_coordinates = x.isdigit() and int(x) > 0 and y.isdigit() and int(y) > 0
-    return positive_coordinates if not sim else int(x) <= sim.width and int(y) <= sim.height
+    if not (COORDINATE_PATTERN.fullmatch(x) and COORDINATE_PATTERN.fullmatch(y)):
+        return False
+
+    int_x, int_y = int(x), int(y) # Parsed once and reused for every check below
+
+    # Car positions may sit on the 0 edge of the field, grid dimensions must be positive
+    if sim:
+        return int_x <= sim.width and int_y <= sim.height
+    return int_x > 0 and int_y > 0
     
 def is_valid_commands(commands: str) -> bool:
 
@@ -95,7 +135,7 @@ def is_valid_commands(commands: str) -> bool:
         bool: True if the command string is valid, False otherwise.
     """
 
-    return bool(re.fullmatch(r"[LRF]+", commands))
+    return bool(commands) and not commands.translate(VALID_COMMANDS_TABLE)
 
 
 # ------------------- Classes --------------------
@@ -109,15 +149,19 @@ class Car:
         name (str): The unique identifier for the car.
         x (int): The current x-coordinate of the car on the grid.
         y (int): The current y-coordinate of the car on the grid.
-        direction (str): The direction the car is facing ('N', 'E', 'S', 'W').
-        commands (List[str]): The list of movement commands ('L', 'R', 'F') to execute.
+        heading (int): The direction the car is facing as a clockwise index into DIRECTIONS (0 = 'N').
+        direction (str): The direction the car is facing ('N', 'E', 'S', 'W'), derived from heading.
+        commands (str): The full string of movement commands ('L', 'R', 'F') given to the car.
+        command_index (int): The position in commands of the next command to execute.
         collided (bool): Whether the car has collided with another car.
     """
 
+    __slots__ = ('name', 'x', 'y', 'heading', 'commands', 'command_index', 'collided')
+
     def __init__(self, name: str, x: int, y: int, direction: str, commands: str) -> None:
 
         """
-        Initializes a Car object with a name, position, direction, and a list of commands.
+        Initializes a Car object with a name, position, direction, and a string of commands.
 
         Args:
             name (str): The unique name of the car.
@@ -130,10 +174,20 @@ class Car:
         self.name = name
         self.x = x
         self.y = y
-        self.direction = direction
-        self.commands = list(commands)
+        self.heading = HEADINGS[direction]
+        self.commands = commands
+        self.command_index = 0
         self.collided = False
     
+    @property
+    def direction(self) -> str:
+
+        """
+        Returns the car's current heading as a direction letter ('N', 'E', 'S', 'W').
+        """
+
+        return DIRECTIONS[self.heading]
+
     def execute_command(self, command: str, width: int, height: int) -> None:
 
         """
@@ -148,11 +202,11 @@ class Car:
         if self.collided:
             return # Ignores commands if the car has collided
         if command == 'L':
-            self.direction = rotate_left(self.direction)
+            self.heading = _turn(self.heading, -1)
         elif command == 'R':
-            self.direction = rotate_right(self.direction)
+            self.heading = _turn(self.heading, 1)
         elif command == 'F':
-            self.x, self.y = move_forward(self.x, self.y, self.direction, width, height)
+            self.x, self.y = _step(self.x, self.y, self.heading, width, height)
 
     def car_details(self, show_commands: bool = False) -> str:
 
@@ -167,7 +221,7 @@ class Car:
         """
 
         return f"Car Name: {self.name} - Position: ({self.x}, {self.y}) - Direction: {self.direction}" \
-            + (f" - Commands: {"".join(self.commands)}" if show_commands else "")
+            + (f" - Commands: {self.commands[self.command_index:]}" if show_commands else "")
 
 class Simulation:
 
@@ -179,8 +233,10 @@ class Simulation:
         height (int): The height of the simulation grid.
         cars (List[Car]): A list of all cars in the simulation.
         car_names (Set[str]): A set of unique car names to prevent duplicates.
-        positions (Dict[Tuple[int, int], Set[Car]]): 
-            A dictionary mapping grid positions (x, y) to sets of cars currently at those positions.
+        positions (Dict[Tuple[int, int], List[Car]]): 
+            A dictionary mapping occupied grid positions (x, y) to the cars currently at those positions.
+            Only collided cars ever share a position, so most entries hold a single car.
+        max_commands (int): The length of the longest command string among the cars.
     """
 
     def __init__(self, width: int, height: int) -> None:
@@ -197,7 +253,8 @@ class Simulation:
         self.height: int = height
         self.cars: List['Car'] = []
         self.car_names: Set[str] = set()
-        self.positions: Dict[Tuple[int, int], Set['Car']] = defaultdict(set)
+        self.positions: Dict[Tuple[int, int], List['Car']] = {}
+        self.max_commands: int = 0
     
     def add_car(self, name: str, x: int, y: int, direction: str, commands: str) -> None:
 
@@ -215,7 +272,42 @@ class Simulation:
         car = Car(name, x, y, direction, commands)
         self.cars.append(car)
         self.car_names.add(name)
-        self.positions[(x, y)].add(car)
+        self.positions.setdefault((x, y), []).append(car)
+        self.max_commands = max(self.max_commands, len(commands))
+
+    def nearby_cars(self, x: int, y: int, radius: int = 1) -> List['Car']:
+
+        """
+        Returns the cars within a square neighbourhood around a grid position.
+
+        The positions map doubles as a uniform spatial hash with a cell size of one grid point,
+        so when the neighbourhood has fewer cells than there are cars, only the (2 * radius + 1)^2
+        surrounding cells are looked up. Otherwise every car is checked once instead.
+
+        Args:
+            x (int): The x-coordinate at the centre of the neighbourhood.
+            y (int): The y-coordinate at the centre of the neighbourhood.
+            radius (int, optional): How many grid points to search in each direction.
+
+        Returns:
+            List[Car]: The cars found in the neighbourhood, including any at (x, y) itself.
+
+        Raises:
+            ValueError: If radius is negative.
+        """
+
+        if radius < 0:
+            raise ValueError(f"radius must be non-negative, got {radius}")
+
+        # Scanning the cars is cheaper than probing a neighbourhood with more cells than cars
+        if (2 * radius + 1) ** 2 > len(self.cars):
+            return [car for car in self.cars if abs(car.x - x) <= radius and abs(car.y - y) <= radius]
+
+        nearby: List['Car'] = []
+        for nx in range(x - radius, x + radius + 1):
+            for ny in range(y - radius, y + radius + 1):
+                nearby.extend(self.positions.get((nx, ny), ()))
+        return nearby
 
     def reset(self) -> None:
 
@@ -226,6 +318,7 @@ class Simulation:
         self.cars.clear()
         self.car_names.clear()
         self.positions.clear()
+        self.max_commands = 0
 
     def show_cars(self, show_commands = False):
 
@@ -236,9 +329,9 @@ class Simulation:
             show_commands (bool, optional): If True, includes the remaining commands for each car.
         """
 
-        print("\nYour current list of cars are:")
-        for car in self.cars:
-            print(f"- {car.car_details(show_commands = show_commands)}")
+        lines: List[str] = ["\nYour current list of cars are:"]
+        lines.extend(f"- {car.car_details(show_commands = show_commands)}" for car in self.cars)
+        print("\n".join(lines))
 
     def run(self) -> bool:
 
@@ -254,43 +347,66 @@ class Simulation:
             return False
         
         self.show_cars()
-        step: int = 0
-        max_commands: int = max(len(car.commands) for car in self.cars)
+
+        # Bound once up front as they are read on every car step
+        width, height = self.width, self.height
+        cars, positions = self.cars, self.positions
         
-        print("\nAfter simulation, the result is:")
+        # Output is buffered and written once at the end rather than printed line by line
+        lines: List[str] = ["\nAfter simulation, the result is:"]
+
+        active: List['Car'] = cars
 
-        for i in range(max_commands):
-            step += 1
+        for step in range(1, self.max_commands + 1):
+
+            # Drops cars that collided or ran out of commands so they are not rescanned every step
+            active = [car for car in active if not car.collided and car.command_index < len(car.commands)]
+            if not active:
+                break
             
-            for car in self.cars:
-                prev_x, prev_y = car.x, car.y
-
-                if not car.collided and car.commands:
-                    command = car.commands.pop(0)
-                    car.execute_command(command, self.width, self.height)
-                    
-                    # Collision handling
-                    collided_cars = []
-
-                    for collided_car in self.positions[(car.x, car.y)]:
-                        if collided_car != car:
-                            collided_car.collided = True
-                            collided_cars.append(collided_car.name)
-
-                    collided_cars = sorted(collided_cars, reverse = True)
-                    
-                    if command == "F" and len(collided_cars) > 0:
-                        car.collided = True
-                        print(f"- {car.name}, collides with {', '.join(collided_cars)} at ({car.x}, {car.y}) at step {step}.")
-                        print(f"- {', '.join(collided_cars)}, collides with {car.name} at ({car.x}, {car.y}) at step {step}.")
-
-                    self.positions[(prev_x, prev_y)].remove(car)
-                    self.positions[(car.x, car.y)].add(car)
+            for car in active:
+
+                if car.collided:
+                    continue # Hit by a car that moved earlier in this step
+
+                prev_position = (car.x, car.y)
+                command = car.commands[car.command_index]
+                car.command_index += 1
+                car.execute_command(command, width, height)
+                position = (car.x, car.y)
+
+                # Turns and blocked moves leave the car in its cell, so there is nothing to update
+                if position == prev_position:
+                    continue
+
+                # Each cell is hashed once: the vacated cell is popped and the new one claimed in a single lookup
+                previous_occupants = positions.pop(prev_position)
+                previous_occupants.remove(car)
+                if previous_occupants:
+                    positions[prev_position] = previous_occupants # Cars added directly on the same cell
+
+                occupants = positions.setdefault(position, [car])
+
+                if occupants[0] is car:
+                    continue # Moved into a free cell
+
+                # Collision handling - only reached when the car moved into an occupied cell
+                collided_cars = sorted((collided_car.name for collided_car in occupants), reverse = True)
+
+                for collided_car in occupants:
+                    collided_car.collided = True
+                car.collided = True
+                occupants.append(car)
+
+                lines.append(f"- {car.name}, collides with {', '.join(collided_cars)} at ({car.x}, {car.y}) at step {step}.")
+                lines.append(f"- {', '.join(collided_cars)}, collides with {car.name} at ({car.x}, {car.y}) at step {step}.")
 
         # Displaying final positions of cars that did not collide
-        for car in self.cars:
+        for car in cars:
             if not car.collided:
-                print(f"- {car.name}, ({car.x}, {car.y}) {car.direction}")
+                lines.append(f"- {car.name}, ({car.x}, {car.y}) {car.direction}")
+
+        print("\n".join(lines))
 
         return True
 
@@ -2,7 +2,7 @@
 
 import io
 import unittest
-import textwrap
+from contextlib import redirect_stdout
 from unittest.mock import patch
 
 from app import (
@@ -11,48 +11,93 @@ from app import (
 )
 
 
+# --------------- Expected Outputs ---------------
+
+EXPECTED_ADD_CAR_OUTPUT = """\
+You have created a field of 5 x 5.
+
+Your current list of cars are:
+- Car Name: A - Position: (1, 2) - Direction: N - Commands: FFRFFFFRRL"""
+
+EXPECTED_SINGLE_CAR_OUTPUT = """\
+Your current list of cars are:
+- Car Name: A - Position: (1, 2) - Direction: N - Commands: FFRFFFFRRL
+
+Your current list of cars are:
+- Car Name: A - Position: (1, 2) - Direction: N
+
+After simulation, the result is:
+- A, (5, 4) S"""
+
+
 # ---------- Tests for Helper Functions ----------
 
 class TestHelperFunctions(unittest.TestCase):
 
     def test_rotate_left(self):
-        self.assertEqual(rotate_left("N"), "W")
-        self.assertEqual(rotate_left("W"), "S")
+        for direction, expected in [("N", "W"), ("W", "S"), ("S", "E"), ("E", "N")]:
+            with self.subTest(direction = direction):
+                self.assertEqual(rotate_left(direction), expected)
 
     def test_rotate_right(self):
-        self.assertEqual(rotate_right("N"), "E")
-        self.assertEqual(rotate_right("E"), "S")
+        for direction, expected in [("N", "E"), ("E", "S"), ("S", "W"), ("W", "N")]:
+            with self.subTest(direction = direction):
+                self.assertEqual(rotate_right(direction), expected)
 
     def test_move_forward(self):
-        self.assertEqual(move_forward(1, 1, "N", 5, 5), (1, 2))
-        self.assertEqual(move_forward(0, 0, "S", 5, 5), (0, 0))
+        for args, expected in [
+            ((1, 1, "N", 5, 5), (1, 2)),
+            ((0, 0, "S", 5, 5), (0, 0)),
+            ((5, 5, "E", 5, 5), (5, 5)),
+            ((1, 1, "W", 5, 5), (0, 1)),
+        ]:
+            with self.subTest(args = args):
+                self.assertEqual(move_forward(*args), expected)
 
     def test_is_valid_coordinates(self):
-        self.assertTrue(is_valid_coordinates("3", "4"))
-        self.assertFalse(is_valid_coordinates("-1", "4"))
+        sim = Simulation(5, 5)
+        for args, expected in [
+            (("3", "4"), True),
+            (("-1", "4"), False),
+            (("\u00b2", "4"), False),
+            (("0", "5", sim), True),
+            (("6", "5", sim), False),
+            (("a", "5", sim), False),
+        ]:
+            with self.subTest(args = args[:2], sim = len(args) == 3):
+                self.assertEqual(is_valid_coordinates(*args), expected)
     
     def test_is_valid_commands(self):
-        self.assertTrue(is_valid_commands("LRF"))
-        self.assertFalse(is_valid_commands("LRFX"))
-        self.assertFalse(is_valid_commands("L R F"))
+        for commands, expected in [("LRF", True), ("LRFX", False), ("L R F", False), ("", False)]:
+            with self.subTest(commands = commands):
+                self.assertEqual(is_valid_commands(commands), expected)
 
 
 # -------------- Tests for Classes ---------------
 
 class TestCar(unittest.TestCase):
 
-    def setUp(self):
-        self.car = Car("A", 1, 2, "N", "FFRFFFFRRL")
+    @classmethod
+    def setUpClass(cls):
+        cls.car = Car("A", 1, 2, "N", "FFRFFFFRRL") # Shared and read-only, tests that drive a car build their own
     
     def test_execute_command(self):
-        self.car.execute_command("L", 5, 5)
-        self.assertEqual(self.car.direction, "W")
-        self.car.execute_command("F", 5, 5)
-        self.assertEqual((self.car.x, self.car.y), (0, 2))
+        for commands, expected in [
+            ("L", (1, 2, "W")),
+            ("LF", (0, 2, "W")),
+            ("LFF", (0, 2, "W")),
+            ("LRF", (1, 3, "N")),
+            ("FFRFFFFRRL", (5, 4, "S")),
+        ]:
+            with self.subTest(commands = commands):
+                car = Car("A", 1, 2, "N", commands)
+                for command in commands:
+                    car.execute_command(command, 5, 5)
+                self.assertEqual((car.x, car.y, car.direction), expected)
     
     def test_car_details(self):
         self.assertIn("A", self.car.car_details())
-        self.assertEqual(self.car.car_details(True), f"Car Name: {self.car.name} - Position: ({self.car.x}, {self.car.y}) - Direction: {self.car.direction} - Commands: {''.join(self.car.commands)}")
+        self.assertEqual(self.car.car_details(True), f"Car Name: {self.car.name} - Position: ({self.car.x}, {self.car.y}) - Direction: {self.car.direction} - Commands: {self.car.commands}")
         self.assertEqual(self.car.car_details(), f"Car Name: {self.car.name} - Position: ({self.car.x}, {self.car.y}) - Direction: {self.car.direction}")
 
 class TestSimulation(unittest.TestCase):
@@ -63,11 +108,29 @@ class TestSimulation(unittest.TestCase):
     def test_add_car(self):
         self.sim.add_car("A", 1, 2, "N", "FFRFFFFRRL")
         self.assertEqual(len(self.sim.cars), 1)
+        self.assertEqual(self.sim.max_commands, 10)
+    
+    def test_nearby_cars(self):
+        self.sim.add_car("A", 1, 2, "N", "FFRFFFFRRL")
+        self.sim.add_car("B", 2, 3, "S", "FF")
+        self.sim.add_car("C", 4, 4, "W", "LRF")
+        self.assertEqual([car.name for car in self.sim.nearby_cars(1, 2)], ["A", "B"])
+        self.assertEqual(len(self.sim.nearby_cars(1, 2, radius = 3)), 3)
+        self.assertEqual(self.sim.nearby_cars(1, 2, radius = 0)[0].name, "A")
+        with self.assertRaises(ValueError):
+            self.sim.nearby_cars(1, 2, radius = -1)
+
+    def test_nearby_cars_many_cars(self):
+        # More cars than cells in the neighbourhood, so the cells are probed rather than the cars scanned
+        for i in range(10):
+            self.sim.add_car(f"C{i}", i % 5, i // 5, "N", "F")
+        self.assertEqual(sorted(car.name for car in self.sim.nearby_cars(0, 0)), ["C0", "C1", "C5", "C6"])
     
     def test_reset(self):
         self.sim.add_car("A", 1, 2, "N", "FFRFFFFRRL")
         self.sim.reset()
         self.assertEqual(len(self.sim.cars), 0)
+        self.assertEqual(self.sim.max_commands, 0)
     
     # def test_run(self):
     #     result = self.sim.run()
@@ -78,140 +141,112 @@ class TestSimulation(unittest.TestCase):
 
 # --- Integration Test for app.py for Single/Multi Cars ----
 
-class TestIntegrationAddCar(unittest.TestCase):
+class IntegrationTestCase(unittest.TestCase):
 
-    @patch("builtins.input", side_effect = ["5 5"])
-    def test_create_simulation(self, mock_input):
+    """
+    Patches input() and redirects stdout once per test class rather than once per test.
+    Each test only sets the inputs it feeds in, and reads the captured output from stdout.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.mock_input = cls.enterClassContext(patch("builtins.input"))
+        cls.stdout = cls.enterClassContext(redirect_stdout(io.StringIO()))
+
+    def setUp(self):
+        self.mock_input.reset_mock(side_effect = True)
+        self.stdout.seek(0)
+        self.stdout.truncate()
+
+class TestIntegrationAddCar(IntegrationTestCase):
+
+    def test_create_simulation(self):
+        self.mock_input.side_effect = ["5 5"]
         sim = create_simulation()
         self.assertEqual(sim.width, 5)
         self.assertEqual(sim.height, 5)
     
-    @patch("builtins.input", side_effect = ["5 5", "A", "1 2 N", "FFRFFFFRRL"])
-    @patch("sys.stdout", new_callable = io.StringIO)
-    def test_add_car(self, mock_stdout, mock_input):
+    def test_add_car(self):
+        self.mock_input.side_effect = ["5 5", "A", "1 2 N", "FFRFFFFRRL"]
         sim = create_simulation()
         add_car(sim)
 
-        expected_output = textwrap.dedent("""\
-        You have created a field of 5 x 5.
-           
-        Your current list of cars are:
-        - Car Name: A - Position: (1, 2) - Direction: N - Commands: FFRFFFFRRL
-        """)
-
         self.assertEqual(len(sim.cars), 1)
-        self.assertEqual(mock_stdout.getvalue().strip(), expected_output.strip())
+        self.assertEqual(self.stdout.getvalue().strip(), EXPECTED_ADD_CAR_OUTPUT)
+    
+    def test_add_car_occupied_position(self):
+        self.mock_input.side_effect = ["B", "1 2 N", "2 2 E", "F"]
+        sim = Simulation(5, 5)
+        sim.add_car("A", 1, 2, "N", "FFRFFFFRRL")
+        add_car(sim)
+
+        self.assertIn("There is already a car at this position.", self.stdout.getvalue())
+        self.assertEqual((sim.cars[-1].name, sim.cars[-1].x, sim.cars[-1].y), ("B", 2, 2))
     
-    @patch("builtins.input", side_effect = ["5 5", "4"])
-    def test_main_exit(self, mock_input):
+    def test_exit_program(self):
+        with self.assertRaises(SystemExit):
+            exit_program()
+        self.assertIn("Thank you for running the simulation. Goodbye!", self.stdout.getvalue())
+
+    # End-to-end smoke test of the menu, the exit behaviour itself is covered by test_exit_program
+    def test_main_exit(self):
+        self.mock_input.side_effect = ["5 5", "4"]
         with self.assertRaises(SystemExit):
             main()
 
-class TestIntegrationSingleCarSimulation(unittest.TestCase):
+class TestIntegrationSingleCarSimulation(IntegrationTestCase):
 
-    @patch("builtins.input", side_effect = ["A", "1 2 N", "FFRFFFFRRL"])
-    @patch("sys.stdout", new_callable = io.StringIO)
-    def test_single_car_run(self, mock_stdout, mock_input):
+    def test_single_car_run(self):
+        self.mock_input.side_effect = ["A", "1 2 N", "FFRFFFFRRL"]
         sim = Simulation(10, 10)
         add_car(sim)
         sim.run()
-        
-        expected_output = textwrap.dedent("""\
-        Your current list of cars are:
-        - Car Name: A - Position: (1, 2) - Direction: N - Commands: FFRFFFFRRL
-
-        Your current list of cars are:
-        - Car Name: A - Position: (1, 2) - Direction: N
 
-        After simulation, the result is:
-        - A, (5, 4) S
-        """)
+        # Canonical full-log check, the other simulation tests only assert on the result lines
+        self.assertEqual(self.stdout.getvalue().strip(), EXPECTED_SINGLE_CAR_OUTPUT)
 
-        self.assertEqual(mock_stdout.getvalue().strip(), expected_output.strip())
+class TestIntegrationMultipleCarSimulation(IntegrationTestCase):
 
-class TestIntegrationMultipleCarSimulation(unittest.TestCase):
+    # Cars A and B start every scenario, each test lists only the cars it adds on top
+    shared_cars = [
+        ("A", 1, 2, "N", "FFRFFFFRRL"),
+        ("B", 7, 8, "W", "FFLFFFFFFF"),
+    ]
 
-    @patch("builtins.input", side_effect = [
-        "A", "1 2 N", "FFRFFFFRRL",
-        "B", "7 8 W", "FFLFFFFFFF",
-        ])
-    @patch("sys.stdout", new_callable = io.StringIO)
-    def test_two_car_collision_run(self, mock_stdout, mock_input):
-        self.maxDiff = None
+    def _run_scenario(self, cars):
         sim = Simulation(10, 10)
-        add_car(sim)
-        add_car(sim)
+        for car in self.shared_cars + cars:
+            sim.add_car(*car)
         sim.run()
-        
-        expected_output = textwrap.dedent("""\
-        Your current list of cars are:
-        - Car Name: A - Position: (1, 2) - Direction: N - Commands: FFRFFFFRRL
-                                          
-        Your current list of cars are:
-        - Car Name: A - Position: (1, 2) - Direction: N - Commands: FFRFFFFRRL
-        - Car Name: B - Position: (7, 8) - Direction: W - Commands: FFLFFFFFFF
-
-        Your current list of cars are:
-        - Car Name: A - Position: (1, 2) - Direction: N
-        - Car Name: B - Position: (7, 8) - Direction: W
-
-        After simulation, the result is:
-        - B, collides with A at (5, 4) at step 7.
-        - A, collides with B at (5, 4) at step 7.
-        """)
-
-        self.assertEqual(mock_stdout.getvalue().strip(), expected_output.strip())
-
-    @patch("builtins.input", side_effect = [
-        "A", "1 2 N", "FFRFFFFRRL",
-        "B", "7 8 W", "FFLFFFFFFF",
-        "C", "5 4 N", "LRLR",
-        "D", "0 0 N", "FFF",
-        ])
-    @patch("sys.stdout", new_callable = io.StringIO)
-    def test_four_car_collision_and_success_run(self, mock_stdout, mock_input):
-        self.maxDiff = None
+
+        # Car listings are covered by the add_car tests, only the simulation result is returned here
+        return self.stdout.getvalue().split("After simulation, the result is:\n")[1].splitlines()
+
+    def test_remaining_commands_after_collision(self):
         sim = Simulation(10, 10)
-        add_car(sim)
-        add_car(sim)
-        add_car(sim)
-        add_car(sim)
+        for car in self.shared_cars:
+            sim.add_car(*car)
         sim.run()
-        
-        expected_output = textwrap.dedent("""\
-        Your current list of cars are:
-        - Car Name: A - Position: (1, 2) - Direction: N - Commands: FFRFFFFRRL
-                                          
-        Your current list of cars are:
-        - Car Name: A - Position: (1, 2) - Direction: N - Commands: FFRFFFFRRL
-        - Car Name: B - Position: (7, 8) - Direction: W - Commands: FFLFFFFFFF
-                                          
-        Your current list of cars are:
-        - Car Name: A - Position: (1, 2) - Direction: N - Commands: FFRFFFFRRL
-        - Car Name: B - Position: (7, 8) - Direction: W - Commands: FFLFFFFFFF
-        - Car Name: C - Position: (5, 4) - Direction: N - Commands: LRLR
-                                          
-        Your current list of cars are:
-        - Car Name: A - Position: (1, 2) - Direction: N - Commands: FFRFFFFRRL
-        - Car Name: B - Position: (7, 8) - Direction: W - Commands: FFLFFFFFFF
-        - Car Name: C - Position: (5, 4) - Direction: N - Commands: LRLR
-        - Car Name: D - Position: (0, 0) - Direction: N - Commands: FFF
-
-        Your current list of cars are:
-        - Car Name: A - Position: (1, 2) - Direction: N
-        - Car Name: B - Position: (7, 8) - Direction: W
-        - Car Name: C - Position: (5, 4) - Direction: N
-        - Car Name: D - Position: (0, 0) - Direction: N
-
-        After simulation, the result is:
-        - A, collides with C at (5, 4) at step 7.
-        - C, collides with A at (5, 4) at step 7.
-        - B, collides with C, A at (5, 4) at step 7.
-        - C, A, collides with B at (5, 4) at step 7.
-        - D, (0, 3) N
-        """)
-
-        self.assertEqual(mock_stdout.getvalue().strip(), expected_output.strip())
+
+        self.assertEqual([car.car_details(True) for car in sim.cars], [
+            "Car Name: A - Position: (5, 4) - Direction: E - Commands: RRL",
+            "Car Name: B - Position: (5, 4) - Direction: S - Commands: FFF",
+        ])
+
+    def test_two_car_collision_run(self):
+        self.assertEqual(self._run_scenario([]), [
+            "- B, collides with A at (5, 4) at step 7.",
+            "- A, collides with B at (5, 4) at step 7.",
+        ])
+
+    def test_four_car_collision_and_success_run(self):
+        self.assertEqual(self._run_scenario([("C", 5, 4, "N", "LRLR"), ("D", 0, 0, "N", "FFF")]), [
+            "- A, collides with C at (5, 4) at step 7.",
+            "- C, collides with A at (5, 4) at step 7.",
+            "- B, collides with C, A at (5, 4) at step 7.",
+            "- C, A, collides with B at (5, 4) at step 7.",
+            "- D, (0, 3) N",
+        ])
 
 if __name__ == "__main__":
     unittest.main()